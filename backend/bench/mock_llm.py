@@ -0,0 +1,196 @@
+# backend/bench/mock_llm.py
+"""
+Local mock LLM server for benchmarks.
+
+Speaks enough of the Anthropic Messages API (``POST /v1/messages``) and the
+OpenAI Chat Completions API (``POST /v1/chat/completions``) for
+``LLMProvider`` to talk to it, with tunable latency, error rate and rate limit.
+
+Run standalone:
+
+    python -m backend.bench.mock_llm --port 8089 --latency-ms 800 --error-rate 0.05
+
+and point the backend at it with ``ANTHROPIC_BASE_URL=http://127.0.0.1:8089``.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+@dataclass
+class MockSettings:
+    latency_ms: float = 500.0
+    jitter_ms: float = 100.0
+    error_rate: float = 0.0  # fraction of requests answered with HTTP 500
+    rate_limit: float = 0.0  # requests per second before HTTP 429; 0 disables
+    seed: int = 205
+
+
+def _grade_json(rng: random.Random) -> str:
+    return json.dumps({
+        "recommended_grade": rng.choice([0, 50, 100]),
+        "confidence": rng.choice(["high", "medium", "low"]),
+        "meets_requirements": [{"requirement": "Program runs", "met": True, "notes": "mock"}],
+        "code_quality": {"runs": True, "logic_correct": True, "style_acceptable": True, "issues": []},
+        "feedback": "Mock feedback from the benchmark LLM server.",
+        "ta_notes": "",
+    })
+
+
+class _RateLimiter:
+    """Token bucket shared by all handler threads."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        if self.rate <= 0:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class MockLLMServer:
+    """Threaded HTTP server wrapper; use as a context manager or call start/stop."""
+
+    def __init__(self, settings: Optional[MockSettings] = None, host: str = "127.0.0.1", port: int = 0):
+        self.settings = settings or MockSettings()
+        self.rng = random.Random(self.settings.seed)
+        self.rng_lock = threading.Lock()
+        self.limiter = _RateLimiter(self.settings.rate_limit)
+        self.stats = {"requests": 0, "errors": 0, "rate_limited": 0}
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockLLMServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "MockLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def count(self, key: str) -> None:
+        with self.rng_lock:
+            self.stats[key] += 1
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):  # keep benchmark output clean
+                pass
+
+            def _send(self, status: int, body: dict, headers: Optional[dict] = None) -> None:
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                s = server.settings
+                with server.rng_lock:
+                    server.stats["requests"] += 1
+                    delay = max(0.0, server.rng.gauss(s.latency_ms, s.jitter_ms)) / 1000
+                    fail = server.rng.random() < s.error_rate
+                    text = _grade_json(server.rng)
+
+                if not server.limiter.allow():
+                    server.count("rate_limited")
+                    self._send(429, {"type": "error", "error": {"type": "rate_limit_error", "message": "mock rate limit"}},
+                               {"retry-after": "1"})
+                    return
+                time.sleep(delay)
+                if fail:
+                    server.count("errors")
+                    self._send(500, {"type": "error", "error": {"type": "api_error", "message": "mock failure"}})
+                    return
+
+                model = payload.get("model", "mock")
+                tokens_in = len(json.dumps(payload.get("messages", []))) // 4
+                tokens_out = len(text) // 4
+                if self.path.rstrip("/").endswith("/messages"):
+                    self._send(200, {
+                        "id": "msg_mock",
+                        "type": "message",
+                        "role": "assistant",
+                        "model": model,
+                        "content": [{"type": "text", "text": text}],
+                        "stop_reason": "end_turn",
+                        "stop_sequence": None,
+                        "usage": {"input_tokens": tokens_in, "output_tokens": tokens_out},
+                    })
+                elif self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send(200, {
+                        "id": "chatcmpl-mock",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": model,
+                        "choices": [{"index": 0, "finish_reason": "stop",
+                                     "message": {"role": "assistant", "content": text}}],
+                        "usage": {"prompt_tokens": tokens_in, "completion_tokens": tokens_out,
+                                  "total_tokens": tokens_in + tokens_out},
+                    })
+                else:
+                    self._send(404, {"error": f"unknown path {self.path}"})
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mock LLM server for GradeFlow benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=500.0)
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests/second, 0 = unlimited")
+    parser.add_argument("--seed", type=int, default=205)
+    args = parser.parse_args()
+
+    settings = MockSettings(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit, args.seed)
+    server = MockLLMServer(settings, args.host, args.port)
+    print(f"mock LLM listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
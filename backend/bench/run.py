@@ -0,0 +1,338 @@
+# backend/bench/run.py
+"""
+Benchmark harness: import, grade-all, listing and export throughput.
+
+The app runs in-process (FastAPI TestClient) against a throwaway SQLite
+database and config file, grading through the local mock LLM server.
+
+    python -m backend.bench.run --students 50 --screenshots 2 --output bench.json
+
+Results are written as one JSON document (schema below) so runs can be
+diffed or collected over time:
+
+    {
+      "schema": 2,
+      "timestamp": "...", "git_rev": "...", "python": "...",
+      "params": {...},
+      "scenarios": [
+        {"name": "import", "unit": "students", "ops": 150, "iterations": 3,
+         "wall_s": 4.2, "throughput_per_s": 35.7,
+         "latency_ms": {"p50": ..., "p99": ..., "mean": ..., "max": ...},
+         "request_latency_ms": {...},
+         "peak_rss_mb": 182.4}
+      ]
+    }
+
+``latency_ms`` is per unit: one sample per imported student
+(``import_student`` span) and per graded submission (``grade_submission``
+span), one per request for listing and export. Import and grade-all also
+report ``request_latency_ms``, the wall time of each whole-archive request.
+Before any scenario the app imports and grades a one-student archive
+untimed, so lazy imports and connection setup are not measured.
+
+``peak_rss_mb`` is the process high-water mark after the scenario, so it only
+grows across scenarios in one run.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from datetime import datetime, timezone
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+try:
+    from .mock_llm import MockLLMServer, MockSettings
+    from .synthetic import ArchiveSpec, build_archive
+except ImportError:
+    from bench.mock_llm import MockLLMServer, MockSettings
+    from bench.synthetic import ArchiveSpec, build_archive
+
+SCHEMA_VERSION = 2
+SCENARIOS = ["import", "grade_all", "listing", "export"]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile; ``samples`` need not be sorted."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes elsewhere
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def _latency_summary(latencies: List[float]) -> Dict:
+    return {
+        "samples": len(latencies),
+        "p50": round(percentile(latencies, 50) * 1000, 3),
+        "p99": round(percentile(latencies, 99) * 1000, 3),
+        "mean": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        "max": round(max(latencies) * 1000, 3) if latencies else 0.0,
+    }
+
+
+def _result(
+    name: str,
+    unit: str,
+    ops: int,
+    iterations: int,
+    wall: float,
+    latencies: List[float],
+    request_latencies: Optional[List[float]] = None,
+) -> Dict:
+    result = {
+        "name": name,
+        "unit": unit,
+        "ops": ops,
+        "iterations": iterations,
+        "wall_s": round(wall, 4),
+        "throughput_per_s": round(ops / wall, 3) if wall > 0 else None,
+        "latency_ms": _latency_summary(latencies),
+    }
+    if request_latencies is not None:
+        result["request_latency_ms"] = _latency_summary(request_latencies)
+    result["peak_rss_mb"] = round(peak_rss_mb(), 1)
+    return result
+
+
+def _timed(fn: Callable[[], object], latencies: List[float]):
+    start = time.perf_counter()
+    out = fn()
+    latencies.append(time.perf_counter() - start)
+    return out
+
+
+@contextmanager
+def _span_samples(stage: str) -> Iterator[List[float]]:
+    """Collect the duration of every ``stage`` span recorded inside the block."""
+    try:
+        from backend.services import metrics
+    except ImportError:
+        from services import metrics
+
+    samples: List[float] = []
+
+    def listener(name: str, seconds: float) -> None:
+        if name == stage:
+            samples.append(seconds)
+
+    metrics.add_span_listener(listener)
+    try:
+        yield samples
+    finally:
+        metrics.remove_span_listener(listener)
+
+
+class Bench:
+    """Holds the TestClient and the synthetic archive shared by all scenarios."""
+
+    def __init__(self, client, archive: bytes, spec: ArchiveSpec, iterations: int):
+        self.client = client
+        self.archive = archive
+        self.spec = spec
+        self.iterations = iterations
+
+    def new_assignment(self) -> int:
+        res = self.client.post(
+            "/api/assignments",
+            data={"name": "bench"},
+            files={"rubric_file": ("rubric.txt", b"Write helper functions and print their output.")},
+        )
+        res.raise_for_status()
+        return res.json()["assignment_id"]
+
+    def import_archive(self, assignment_id: int, archive: Optional[bytes] = None):
+        res = self.client.post(
+            f"/api/assignments/{assignment_id}/import-folder",
+            files={"archive": ("submissions.zip", archive or self.archive, "application/zip")},
+        )
+        res.raise_for_status()
+        return res.json()
+
+    def warm_up(self) -> None:
+        """Untimed one-student import and grade-all, so first-use costs are not measured."""
+        archive = build_archive(replace(self.spec, students=1))
+        aid = self.new_assignment()
+        self.import_archive(aid, archive)
+        self.client.post(f"/api/assignments/{aid}/grade-all").raise_for_status()
+
+    def run_import(self) -> Dict:
+        requests: List[float] = []
+        with _span_samples("import_student") as students:
+            start = time.perf_counter()
+            for _ in range(self.iterations):
+                aid = self.new_assignment()
+                _timed(lambda: self.import_archive(aid), requests)
+            wall = time.perf_counter() - start
+        return _result("import", "students", self.spec.students * self.iterations,
+                       self.iterations, wall, students, requests)
+
+    def run_grade_all(self) -> Dict:
+        requests: List[float] = []
+        submissions: List[float] = []
+        graded = 0
+        wall = 0.0
+        for _ in range(self.iterations):
+            # fresh, ungraded assignment each round; import time is not counted
+            aid = self.new_assignment()
+            self.import_archive(aid)
+            with _span_samples("grade_submission") as samples:
+                start = time.perf_counter()
+                res = _timed(lambda: self.client.post(f"/api/assignments/{aid}/grade-all"), requests)
+                wall += time.perf_counter() - start
+            submissions.extend(samples)
+            res.raise_for_status()
+            graded += res.json()["graded"]
+        return _result("grade_all", "submissions", graded, self.iterations, wall, submissions, requests)
+
+    def _repeat_get(self, name: str, path: str, unit_ops: int) -> Dict:
+        latencies: List[float] = []
+        rounds = self.iterations * 10
+        start = time.perf_counter()
+        for _ in range(rounds):
+            res = _timed(lambda: self.client.get(path), latencies)
+            res.raise_for_status()
+        wall = time.perf_counter() - start
+        return _result(name, "requests", rounds * unit_ops, rounds, wall, latencies)
+
+    def run_listing(self, assignment_id: int) -> Dict:
+        return self._repeat_get("listing", f"/api/assignments/{assignment_id}/submissions", 1)
+
+    def run_export(self, assignment_id: int) -> Dict:
+        return self._repeat_get("export", f"/api/assignments/{assignment_id}/export", 1)
+
+
+def _load_app(workdir: Path, llm_url: Optional[str]):
+    """Import the FastAPI app pointed at throwaway state. Must run before any backend import."""
+    os.environ["GRADEFLOW_DB"] = str(workdir / "bench.db")
+    os.environ["GRADEFLOW_CONFIG"] = str(workdir / "config.json")
+    if llm_url:
+        os.environ["ANTHROPIC_BASE_URL"] = llm_url
+        os.environ["OPENAI_BASE_URL"] = f"{llm_url}/v1"
+        os.environ.setdefault("ANTHROPIC_API_KEY", "bench")
+        os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+    from fastapi.testclient import TestClient
+    try:
+        from backend.main import app
+        from backend.config import set_provider
+    except ImportError:
+        from main import app
+        from config import set_provider
+
+    # the mock speaks the Anthropic API; "ollama" falls through to the built-in stub
+    set_provider("anthropic" if llm_url else "ollama", "mock-model" if llm_url else None)
+    return TestClient(app)
+
+
+def run(args: argparse.Namespace) -> Dict:
+    spec = ArchiveSpec(
+        students=args.students,
+        code_files=args.code_files,
+        code_bytes=args.code_bytes,
+        screenshots=args.screenshots,
+        screenshot_size=(args.screenshot_width, args.screenshot_height),
+        seed=args.seed,
+    )
+    archive = build_archive(spec)
+    scenarios = args.scenarios or SCENARIOS
+    results: List[Dict] = []
+
+    mock = None
+    if not args.stub_llm:
+        settings = MockSettings(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit, args.seed)
+        mock = MockLLMServer(settings).start()
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            client = _load_app(Path(tmp), mock.url if mock else None)
+            with client:
+                bench = Bench(client, archive, spec, args.iterations)
+                bench.warm_up()
+                if "import" in scenarios:
+                    results.append(bench.run_import())
+                if "grade_all" in scenarios:
+                    results.append(bench.run_grade_all())
+                if "listing" in scenarios or "export" in scenarios:
+                    aid = bench.new_assignment()
+                    bench.import_archive(aid)
+                    if "listing" in scenarios:
+                        results.append(bench.run_listing(aid))
+                    if "export" in scenarios:
+                        results.append(bench.run_export(aid))
+    finally:
+        if mock:
+            mock.stop()
+
+    params = vars(args).copy()
+    params.pop("output", None)
+    params["archive_bytes"] = len(archive)
+    return {
+        "schema": SCHEMA_VERSION,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_rev": _git_rev(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": params,
+        "mock_llm": mock.stats if mock else None,
+        "scenarios": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="GradeFlow import/grading benchmarks")
+    parser.add_argument("--scenarios", nargs="*", choices=SCENARIOS, help="default: all")
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--students", type=int, default=30)
+    parser.add_argument("--code-files", type=int, default=2)
+    parser.add_argument("--code-bytes", type=int, default=4000)
+    parser.add_argument("--screenshots", type=int, default=2)
+    parser.add_argument("--screenshot-width", type=int, default=1920)
+    parser.add_argument("--screenshot-height", type=int, default=1080)
+    parser.add_argument("--seed", type=int, default=205)
+    parser.add_argument("--stub-llm", action="store_true", help="skip the mock server and use the built-in stub")
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="mock requests/second, 0 = unlimited")
+    parser.add_argument("--output", "-o", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+        for s in report["scenarios"]:
+            print(f"{s['name']:<10} {s['throughput_per_s']:>10} {s['unit']}/s  "
+                  f"p50 {s['latency_ms']['p50']:.1f}ms  p99 {s['latency_ms']['p99']:.1f}ms  "
+                  f"rss {s['peak_rss_mb']}MB")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# backend/bench/startup.py
+"""
+Import-time budget check for ``backend.main``.
+
+Imports the app in a fresh interpreter, several times, and fails (exit code 1)
+if the median cold import exceeds the budget or if any heavy optional module
+was imported eagerly. Intended to run in CI before a deploy:
+
+    python -m backend.bench.startup --budget 1.5
+
+Prints a JSON report in the same spirit as ``backend.bench.run``.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# modules that must only be imported when a provider, OCR or PDF path is used
+LAZY_MODULES = ["openai", "anthropic", "pytesseract", "PIL", "PyPDF2"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import backend.main
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+"""
+
+
+def measure(runs: int = 5) -> Dict:
+    """Cold-import ``backend.main`` ``runs`` times, each in a new interpreter."""
+    root = Path(__file__).resolve().parents[2]
+    samples: List[float] = []
+    eager: set = set()
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE % (LAZY_MODULES,)],
+            capture_output=True, text=True, check=True, cwd=root,
+        )
+        probe = json.loads(out.stdout.strip().splitlines()[-1])
+        samples.append(probe["seconds"])
+        eager.update(probe["loaded"])
+    return {
+        "runs": runs,
+        "median_s": round(statistics.median(samples), 4),
+        "max_s": round(max(samples), 4),
+        "eager_modules": sorted(eager),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Check backend.main import time against a budget")
+    parser.add_argument("--budget", type=float, default=1.5, help="max median import time in seconds")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    report = measure(args.runs)
+    report["budget_s"] = args.budget
+    failures = []
+    if report["median_s"] > args.budget:
+        failures.append(f"median import {report['median_s']}s exceeds budget {args.budget}s")
+    if report["eager_modules"]:
+        failures.append(f"imported eagerly: {', '.join(report['eager_modules'])}")
+    report["ok"] = not failures
+    report["failures"] = failures
+
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# backend/bench/synthetic.py
+"""
+Generate synthetic Canvas download archives for benchmarking.
+
+Files are named the way Canvas names them and the way
+``parse_canvas_filename`` expects:
+
+    lastname_firstname_canvasid_assignmentinfo_originalfilename.ext
+"""
+import io
+import random
+import zipfile
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from PIL import Image, ImageDraw
+
+FIRST_NAMES = [
+    "john", "maria", "wei", "aisha", "carlos", "emily", "sean", "priya",
+    "omar", "lucia", "kenji", "fatima", "noah", "elena", "tariq", "grace",
+]
+LAST_NAMES = [
+    "smith", "garcia", "chen", "khan", "lopez", "nguyen", "brien", "patel",
+    "ali", "rossi", "tanaka", "haddad", "jones", "ivanova", "okafor", "kim",
+]
+
+
+@dataclass
+class ArchiveSpec:
+    students: int = 30
+    code_files: int = 2  # per student
+    code_bytes: int = 4_000  # approximate size of each .py file
+    screenshots: int = 2  # per student
+    screenshot_size: Tuple[int, int] = (1920, 1080)
+    assignment_tag: str = "lab1"
+    seed: int = 205
+
+
+def _student_names(count: int, rng: random.Random) -> List[Tuple[str, str, str]]:
+    """Return unique (lastname, firstname, canvas_id) triples."""
+    names = []
+    seen = set()
+    while len(names) < count:
+        last = rng.choice(LAST_NAMES)
+        first = rng.choice(FIRST_NAMES)
+        # a numeric suffix keeps names unique for large rosters
+        if (last, first) in seen:
+            first = f"{first}{rng.choice('abcdefghijklmnopqrstuvwxyz')}{len(names)}"
+        seen.add((last, first))
+        canvas_id = str(10000 + len(names) * 7 + rng.randint(0, 6))
+        names.append((last, first, canvas_id))
+    return names
+
+
+def make_code(size: int, rng: random.Random) -> str:
+    """Python source of roughly ``size`` bytes with imports, functions and a main guard."""
+    lines = ["import math", "from random import randint", ""]
+    i = 0
+    while sum(len(l) + 1 for l in lines) < size:
+        lines += [
+            f"def helper_{i}(x, y={rng.randint(1, 9)}):",
+            f"    \"\"\"Helper number {i}.\"\"\"",
+            f"    total = x * y + math.floor({rng.random():.4f} * x)",
+            f"    for k in range({rng.randint(2, 12)}):",
+            "        total += randint(0, k)",
+            "    return total",
+            "",
+        ]
+        i += 1
+    lines += ["", "if __name__ == \"__main__\":", "    print(helper_0(3))", ""]
+    return "\n".join(lines)
+
+
+def make_screenshot(size: Tuple[int, int], rng: random.Random) -> bytes:
+    """PNG that looks roughly like a terminal window with program output."""
+    width, height = size
+    img = Image.new("RGB", size, (40, 44, 52))
+    draw = ImageDraw.Draw(img)
+    # title bar and a light content area, so chrome cropping has work to do
+    draw.rectangle((0, 0, width, max(height // 30, 12)), fill=(200, 200, 200))
+    margin = max(width // 40, 4)
+    draw.rectangle((margin, height // 20, width - margin, height - margin), fill=(250, 250, 250))
+    y = height // 20 + 10
+    step = max(height // 40, 12)
+    while y < height - margin - step:
+        text = f">>> helper_{rng.randint(0, 20)}({rng.randint(0, 99)}) = {rng.randint(0, 9999)}"
+        draw.text((margin + 10, y), text, fill=(0, 0, 0))
+        y += step
+    out = io.BytesIO()
+    img.save(out, format="PNG")
+    return out.getvalue()
+
+
+def build_archive(spec: ArchiveSpec) -> bytes:
+    """Build a zip file in memory and return its bytes."""
+    rng = random.Random(spec.seed)
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zf:
+        for last, first, canvas_id in _student_names(spec.students, rng):
+            prefix = f"{last}_{first}_{canvas_id}_{spec.assignment_tag}"
+            for n in range(spec.code_files):
+                zf.writestr(f"{prefix}_main{n}.py", make_code(spec.code_bytes, rng))
+            for n in range(spec.screenshots):
+                zf.writestr(f"{prefix}_output{n}.png", make_screenshot(spec.screenshot_size, rng))
+    return out.getvalue()
@@ -1,31 +1,105 @@
 import json
+import os
+import tempfile
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
 
-_CONFIG_PATH = Path(__file__).parent / "config.json"
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+# GRADEFLOW_CONFIG overrides the location (used by the benchmark harness).
+# The file is the shared store for every worker process: writes are atomic
+# and serialised by a lock file, and readers reload whenever the file on
+# disk changes, so `uvicorn --workers N` all see the same provider.
+_CONFIG_PATH = Path(os.getenv("GRADEFLOW_CONFIG", Path(__file__).parent / "config.json"))
+_LOCK_PATH = _CONFIG_PATH.with_name(_CONFIG_PATH.name + ".lock")
 
 # default configuration
-_config: Dict[str, Optional[str]] = {
+_DEFAULTS: Dict[str, Optional[str]] = {
     "provider": "ollama",
     "model": None,
 }
 
-# load persisted config on import
-if _CONFIG_PATH.exists():
+_config: Dict[str, Optional[str]] = dict(_DEFAULTS)
+# (mtime_ns, size, inode) of the file _config was loaded from
+_stamp: Optional[Tuple[int, int, int]] = None
+
+
+def _file_stamp() -> Optional[Tuple[int, int, int]]:
     try:
-        _config.update(json.loads(_CONFIG_PATH.read_text()))
-    except Exception:  # pragma: no cover - best effort
+        st = _CONFIG_PATH.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _read_file() -> Dict[str, Optional[str]]:
+    return {**_DEFAULTS, **json.loads(_CONFIG_PATH.read_text())}
+
+
+def _refresh() -> None:
+    """Reload from disk if another worker has rewritten the file."""
+    global _config, _stamp
+    stamp = _file_stamp()
+    if stamp is None or stamp == _stamp:
+        return
+    try:
+        _config = _read_file()
+        _stamp = stamp
+    except Exception:  # pragma: no cover - best effort, keep last good config
         pass
 
 
+class _FileLock:
+    """Exclusive advisory lock serialising read-modify-write across processes."""
+
+    def __enter__(self):
+        self._fh = open(_LOCK_PATH, "a+")
+        if fcntl is not None:
+            fcntl.flock(self._fh, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self._fh, fcntl.LOCK_UN)
+        self._fh.close()
+
+
+def _write_atomic(data: Dict) -> None:
+    fd, tmp = tempfile.mkstemp(dir=_CONFIG_PATH.parent, prefix=".config-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(json.dumps(data))
+        os.replace(tmp, _CONFIG_PATH)
+    except Exception:
+        os.unlink(tmp)
+        raise
+
+
+# load persisted config on import
+_refresh()
+
+
 def get_config() -> Dict[str, Optional[str]]:
+    _refresh()
     return _config.copy()
 
 
 def set_provider(provider: str, model: Optional[str] = None) -> None:
-    _config["provider"] = provider
-    _config["model"] = model
-    try:
-        _CONFIG_PATH.write_text(json.dumps(_config))
-    except Exception:  # pragma: no cover
-        pass
+    """
+    Persist a provider change for every worker.
+
+    Errors (lock, permissions, disk full) propagate and leave this worker's
+    config untouched, so no worker ever diverges from what is on disk.
+    """
+    global _config, _stamp
+    with _FileLock():
+        # start from the latest on-disk contents so concurrent writers don't clobber each other
+        _stamp = None
+        _refresh()
+        updated = {**_config, "provider": provider, "model": model}
+        _write_atomic(updated)
+        _config = updated
+        _stamp = _file_stamp()
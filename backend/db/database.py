@@ -1,13 +1,67 @@
 from __future__ import annotations
 import json
-from typing import Optional, List, Dict, Any
+import os
+import random
+import time
+from functools import wraps
+from typing import Optional, List, Dict, Any, Callable, TypeVar
 from pathlib import Path
 
+from sqlalchemy import Column, LargeBinary, delete, event, inspect, text
+from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError
 from sqlmodel import SQLModel, Field, create_engine, Session, select
 
-# default database file next to this module
-DB_PATH = Path(__file__).parent / "gradeflow.db"
-ENGINE = create_engine(f"sqlite:///{DB_PATH}", echo=False, connect_args={"check_same_thread": False})
+# default database file next to this module; GRADEFLOW_DB overrides it
+DB_PATH = Path(os.getenv("GRADEFLOW_DB", Path(__file__).parent / "gradeflow.db"))
+# GRADEFLOW_DATABASE_URL points at any SQLAlchemy database (e.g. postgresql://...)
+# and takes precedence over the SQLite file when running several hosts/workers.
+DATABASE_URL = os.getenv("GRADEFLOW_DATABASE_URL", f"sqlite:///{DB_PATH}")
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+# seconds a SQLite connection waits on another process's write lock
+SQLITE_BUSY_TIMEOUT = float(os.getenv("GRADEFLOW_SQLITE_BUSY_TIMEOUT", "30"))
+# extra attempts for writes that still fail with "database is locked"
+DB_WRITE_RETRIES = 5
+
+if IS_SQLITE:
+    ENGINE = create_engine(
+        DATABASE_URL,
+        echo=False,
+        connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT},
+    )
+
+    @event.listens_for(ENGINE, "connect")
+    def _sqlite_pragmas(dbapi_conn, _record):
+        # WAL lets readers in other workers proceed while one worker writes
+        cur = dbapi_conn.cursor()
+        cur.execute("PRAGMA journal_mode=WAL")
+        cur.execute("PRAGMA synchronous=NORMAL")
+        cur.execute(f"PRAGMA busy_timeout={int(SQLITE_BUSY_TIMEOUT * 1000)}")
+        cur.close()
+else:
+    ENGINE = create_engine(DATABASE_URL, echo=False, pool_pre_ping=True)
+
+T = TypeVar("T")
+
+
+def _is_locked(exc: OperationalError) -> bool:
+    msg = str(exc).lower()
+    return "database is locked" in msg or "database is busy" in msg
+
+
+def retry_on_locked(fn: Callable[..., T]) -> Callable[..., T]:
+    """Retry a write when SQLite reports the database as locked by another process."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        for attempt in range(DB_WRITE_RETRIES + 1):
+            try:
+                return fn(*args, **kwargs)
+            except OperationalError as e:
+                if not _is_locked(e) or attempt == DB_WRITE_RETRIES:
+                    raise
+                # jittered backoff so competing workers don't retry in lockstep
+                time.sleep(0.05 * 2 ** attempt * (0.5 + random.random()))
+    return wrapper
 
 
 class Assignment(SQLModel, table=True):
@@ -28,8 +82,44 @@ class Submission(SQLModel, table=True):
     final_grade: Optional[int] = None
 
 
-# create tables if not exist
-SQLModel.metadata.create_all(ENGINE)
+class ScreenshotImage(SQLModel, table=True):
+    """Full-size screenshot bytes, kept out of ``Submission.screenshots`` so listings stay light."""
+    submission_id: int = Field(foreign_key="submission.id", primary_key=True)
+    position: int = Field(primary_key=True)  # index into Submission.screenshots
+    mime_type: str
+    data: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+
+
+# arbitrary key for the PostgreSQL advisory lock guarding schema creation
+_SCHEMA_LOCK_KEY = 0x67726164
+
+
+@retry_on_locked
+def init_db() -> None:
+    """
+    Create tables if they do not exist.
+
+    Every worker calls this at startup. On PostgreSQL an advisory lock
+    serialises creation. Elsewhere a worker that loses the race to create
+    a table runs create_all again (existing tables are skipped) until the
+    whole schema is present, rather than matching on error text.
+    """
+    for attempt in range(DB_WRITE_RETRIES + 1):
+        try:
+            with ENGINE.begin() as conn:
+                if conn.dialect.name == "postgresql":
+                    # released when the transaction commits
+                    conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _SCHEMA_LOCK_KEY})
+                SQLModel.metadata.create_all(conn)
+            return
+        except (OperationalError, ProgrammingError, IntegrityError) as e:
+            if isinstance(e, OperationalError) and _is_locked(e):
+                raise  # retried by @retry_on_locked
+            if set(SQLModel.metadata.tables) <= set(inspect(ENGINE).get_table_names()):
+                return
+            if attempt == DB_WRITE_RETRIES:
+                raise
+            time.sleep(0.05 * (0.5 + random.random()))
 
 
 def _to_json(v: Optional[str]) -> Any:
@@ -45,6 +135,7 @@ def _from_json(v: Any) -> str:
     return json.dumps(v)
 
 
+@retry_on_locked
 def create_assignment(name: str, rubric_text: str, syllabus_text: Optional[str] = None) -> int:
     with Session(ENGINE) as session:
         a = Assignment(name=name, rubric_text=rubric_text, syllabus_text=syllabus_text)
@@ -60,6 +151,7 @@ def get_assignments() -> List[Dict[str, Any]]:
         return [{"id": a.id, "name": a.name} for a in assigns]
 
 
+@retry_on_locked
 def create_submission(assignment_id: int, student_name: str, canvas_id: Optional[str]) -> int:
     with Session(ENGINE) as session:
         s = Submission(assignment_id=assignment_id, student_name=student_name, canvas_id=canvas_id)
@@ -69,7 +161,18 @@ def create_submission(assignment_id: int, student_name: str, canvas_id: Optional
         return s.id
 
 
-def update_submission_content(sub_id: int, code_content: List[Dict], screenshots: List[Dict]) -> None:
+@retry_on_locked
+def update_submission_content(
+    sub_id: int,
+    code_content: List[Dict],
+    screenshots: List[Dict],
+    images: Optional[List[Dict]] = None,
+) -> None:
+    """
+    Store parsed code and screenshot metadata. ``images`` holds the full-size
+    screenshots ({"data": bytes, "mime_type": str}) in the same order as
+    ``screenshots``; they go to the ScreenshotImage table, not the JSON column.
+    """
     with Session(ENGINE) as session:
         sub = session.get(Submission, sub_id)
         if not sub:
@@ -77,9 +180,26 @@ def update_submission_content(sub_id: int, code_content: List[Dict], screenshots
         sub.code_files = _from_json(code_content)
         sub.screenshots = _from_json(screenshots)
         session.add(sub)
+        if images is not None:
+            session.exec(delete(ScreenshotImage).where(ScreenshotImage.submission_id == sub_id))
+            for position, image in enumerate(images):
+                session.add(ScreenshotImage(
+                    submission_id=sub_id,
+                    position=position,
+                    mime_type=image["mime_type"],
+                    data=image["data"],
+                ))
         session.commit()
 
 
+def get_screenshot_image(submission_id: int, position: int) -> Optional[Dict[str, Any]]:
+    with Session(ENGINE) as session:
+        img = session.get(ScreenshotImage, (submission_id, position))
+        if not img:
+            return None
+        return {"data": img.data, "mime_type": img.mime_type}
+
+
 def get_submissions_by_assignment(assignment_id: int) -> List[Dict[str, Any]]:
     with Session(ENGINE) as session:
         subs = session.exec(select(Submission).where(Submission.assignment_id == assignment_id)).all()
@@ -113,6 +233,7 @@ def get_submission(submission_id: int) -> Optional[Dict[str, Any]]:
         }
 
 
+@retry_on_locked
 def set_submission_grade(submission_id: int, grade_result: Dict) -> None:
     with Session(ENGINE) as session:
         s = session.get(Submission, submission_id)
@@ -123,6 +244,7 @@ def set_submission_grade(submission_id: int, grade_result: Dict) -> None:
         session.commit()
 
 
+@retry_on_locked
 def set_final_grade(submission_id: int, grade: int) -> None:
     with Session(ENGINE) as session:
         s = session.get(Submission, submission_id)
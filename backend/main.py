@@ -1,6 +1,8 @@
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, Response, PlainTextResponse
+import time
+from contextlib import asynccontextmanager
 import zipfile
 import tempfile
 import shutil
@@ -8,10 +10,12 @@ from pathlib import Path
 from typing import Optional
 import base64
 import json
+import mimetypes
 
 # Support both running as a package (from project root) and directly (from backend dir)
 try:
     from .db.database import (
+        init_db,
         create_assignment,
         get_assignments,
         create_submission,
@@ -22,17 +26,22 @@ try:
         set_final_grade,
         export_grades,
         get_assignment,
+        get_screenshot_image,
     )
     from .services.file_parser import (
         group_files_by_student,
         parse_python_file,
         extract_screenshot_text,
+        normalize_screenshot,
     )
     from .services.llm_provider import LLMProvider
     from .services.grader import GradingService
+    from .services import metrics
+    from .services.metrics import span
     from .config import get_config, set_provider
 except ImportError:
     from db.database import (
+        init_db,
         create_assignment,
         get_assignments,
         create_submission,
@@ -43,17 +52,28 @@ except ImportError:
         set_final_grade,
         export_grades,
         get_assignment,
+        get_screenshot_image,
     )
     from services.file_parser import (
         group_files_by_student,
         parse_python_file,
         extract_screenshot_text,
+        normalize_screenshot,
     )
     from services.llm_provider import LLMProvider
     from services.grader import GradingService
+    from services import metrics
+    from services.metrics import span
     from config import get_config, set_provider
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # schema setup runs once per worker at startup rather than at import time
+    init_db()
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -62,6 +82,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - start
+        # use the route template so ids don't explode label cardinality
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        metrics.HTTP_SECONDS.observe(elapsed, method=request.method, route=path, status=status)
+        metrics.log_event("request", method=request.method, route=path, path=request.url.path,
+                          status=status, duration_ms=round(elapsed * 1000, 3))
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 # ----- Configuration endpoints -----
 @app.get("/api/providers")
 async def providers():
@@ -147,59 +188,84 @@ async def import_submission_folder(
         
         # Save and extract zip
         zip_path = tmp_path / "submissions.zip"
-        with open(zip_path, "wb") as f:
-            content = await archive.read()
-            f.write(content)
+        with span("upload_read"):
+            with open(zip_path, "wb") as f:
+                content = await archive.read()
+                f.write(content)
         
         extract_dir = tmp_path / "extracted"
-        with zipfile.ZipFile(zip_path, 'r') as zf:
-            zf.extractall(extract_dir)
+        with span("zip_extract"):
+            with zipfile.ZipFile(zip_path, 'r') as zf:
+                zf.extractall(extract_dir)
         
         # Gather all submission files
-        all_files = []
-        for ext in ["*.py", "*.png", "*.jpg", "*.jpeg", "*.PNG", "*.JPG"]:
-            all_files.extend(extract_dir.rglob(ext))
-        
-        # Group by student
-        grouped = group_files_by_student([str(f) for f in all_files])
+        with span("group_files"):
+            all_files = []
+            for ext in ["*.py", "*.png", "*.jpg", "*.jpeg", "*.PNG", "*.JPG"]:
+                all_files.extend(extract_dir.rglob(ext))
+            
+            # Group by student
+            grouped = group_files_by_student([str(f) for f in all_files])
         
         results = []
         for student_name, data in grouped.items():
-            # Create submission record
-            sub_id = create_submission(
-                assignment_id=assignment_id,
-                student_name=student_name,
-                canvas_id=data["canvas_id"]
-            )
+            with span("import_student", student=student_name):
+                # Create submission record
+                with span("db_create_submission"):
+                    sub_id = create_submission(
+                        assignment_id=assignment_id,
+                        student_name=student_name,
+                        canvas_id=data["canvas_id"]
+                    )
             
-            # Process each file
-            code_content = []
-            screenshots = []
+                # Process each file
+                code_content = []
+                screenshots = []
+                images = []
             
-            for file_info in data["files"]:
-                file_path = Path(file_info["path"])
+                for file_info in data["files"]:
+                    file_path = Path(file_info["path"])
                 
-                if file_info["type"] == "code":
-                    with open(file_path) as f:
-                        parsed = parse_python_file(f.read())
-                        code_content.append({
-                            "filename": file_info["original_name"],
-                            **parsed
-                        })
-                else:
-                    with open(file_path, "rb") as f:
-                        ocr_text = await extract_screenshot_text(f.read())
-                        # Also store the image bytes for display
-                        f.seek(0)
-                        img_b64 = base64.b64encode(f.read()).decode()
+                    if file_info["type"] == "code":
+                        with span("parse_code"), open(file_path) as f:
+                            parsed = parse_python_file(f.read())
+                            code_content.append({
+                                "filename": file_info["original_name"],
+                                **parsed
+                            })
+                    else:
+                        with open(file_path, "rb") as f:
+                            raw = f.read()
+                        try:
+                            # Thumbnail + recompressed full image, and an OCR-ready copy
+                            with span("image_normalize"):
+                                normalized = normalize_screenshot(raw)
+                        except Exception:
+                            # Not decodable by PIL; keep the original bytes as-is
+                            mime = mimetypes.guess_type(file_info["original_name"])[0] or "image/png"
+                            normalized = {
+                                "image": raw,
+                                "mime_type": mime,
+                                "thumbnail": raw,
+                                "thumbnail_mime_type": mime,
+                                "ocr_image": None,
+                            }
+                        ocr_input = normalized["ocr_image"] if normalized["ocr_image"] is not None else raw
+                        with span("ocr"):
+                            ocr_text = await extract_screenshot_text(ocr_input)
                         screenshots.append({
                             "filename": file_info["original_name"],
                             "ocr_text": ocr_text,
-                            "image_data": img_b64
+                            "mime_type": normalized["mime_type"],
+                            "thumbnail_mime_type": normalized["thumbnail_mime_type"],
+                            "thumbnail_data": base64.b64encode(normalized["thumbnail"]).decode(),
                         })
+                        # full image is stored as raw bytes in its own table
+                        images.append({"data": normalized["image"], "mime_type": normalized["mime_type"]})
             
-            # Update submission with all content
-            update_submission_content(sub_id, code_content, screenshots)
+                # Update submission with all content
+                with span("db_update_submission"):
+                    update_submission_content(sub_id, code_content, screenshots, images)
             
             results.append({
                 "student": student_name,
@@ -216,16 +282,59 @@ async def import_submission_folder(
         }
 
 # ----- Submission retrieval -----
+def _screenshot_mime(ss: dict) -> str:
+    return ss.get("mime_type") or mimetypes.guess_type(ss.get("filename", ""))[0] or "image/png"
+
+
+def _with_thumbnails(sub: dict) -> dict:
+    """
+    Make sure every screenshot carries a thumbnail and no full-size payload.
+    Only submissions imported before thumbnails existed still have
+    ``image_data`` in the JSON column; the full image is fetched lazily via
+    /api/submissions/{id}/screenshots/{index}.
+    """
+    screenshots = []
+    for ss in sub.get("screenshots", []):
+        thumb = {k: v for k, v in ss.items() if k != "image_data"}
+        if "thumbnail_data" not in thumb:
+            # submissions imported before thumbnails existed
+            thumb["thumbnail_data"] = ss.get("image_data", "")
+            thumb["thumbnail_mime_type"] = _screenshot_mime(ss)
+        screenshots.append(thumb)
+    return {**sub, "screenshots": screenshots}
+
+
 @app.get("/api/assignments/{assignment_id}/submissions")
 async def submissions_for_assignment(assignment_id: int):
-    return get_submissions_by_assignment(assignment_id)
+    return [_with_thumbnails(s) for s in get_submissions_by_assignment(assignment_id)]
 
 @app.get("/api/submissions/{submission_id}")
 async def submission_detail(submission_id: int):
     sub = get_submission(submission_id)
     if not sub:
         raise HTTPException(status_code=404, detail="Submission not found")
-    return sub
+    return _with_thumbnails(sub)
+
+@app.get("/api/submissions/{submission_id}/screenshots/{index}")
+async def submission_screenshot(submission_id: int, index: int):
+    image = get_screenshot_image(submission_id, index)
+    if image:
+        content, media_type = image["data"], image["mime_type"]
+    else:
+        # submissions imported before full images moved to their own table
+        sub = get_submission(submission_id)
+        if not sub:
+            raise HTTPException(status_code=404, detail="Submission not found")
+        screenshots = sub.get("screenshots", [])
+        if index < 0 or index >= len(screenshots) or "image_data" not in screenshots[index]:
+            raise HTTPException(status_code=404, detail="Screenshot not found")
+        ss = screenshots[index]
+        content, media_type = base64.b64decode(ss["image_data"]), _screenshot_mime(ss)
+    return Response(
+        content=content,
+        media_type=media_type,
+        headers={"Cache-Control": "private, max-age=86400"},
+    )
 
 # ----- Grading endpoints -----
 @app.post("/api/assignments/{assignment_id}/grade/{submission_id}")
@@ -245,15 +354,19 @@ async def grade_single(assignment_id: int, submission_id: int):
 
 @app.post("/api/assignments/{assignment_id}/grade-all")
 async def grade_all(assignment_id: int):
-    subs = get_submissions_by_assignment(assignment_id)
-    assign = get_assignment(assignment_id)
+    with span("db_load_submissions"):
+        subs = get_submissions_by_assignment(assignment_id)
+        assign = get_assignment(assignment_id)
     rubric = assign.get("rubric_text", "") if assign else ""
     grader = GradingService(LLMProvider())
     count = 0
     for sdata in subs:
         if sdata.get("grade") is None:
-            res = await grader.grade_submission(sdata, rubric)
-            set_submission_grade(sdata["id"], res)
+            with span("grade_submission", submission_id=sdata["id"]):
+                with span("llm_grade"):
+                    res = await grader.grade_submission(sdata, rubric)
+                with span("db_commit_grade"):
+                    set_submission_grade(sdata["id"], res)
             count += 1
     return {"graded": count}
 
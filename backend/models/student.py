@@ -1,6 +1,6 @@
 # This module can be used to define student-related ORM models.
 # Current implementation keeps models in db/database.py; re-export if needed.
 
-from ..db.database import Submission
+from ..db.database import Submission, ScreenshotImage
 
-__all__ = ["Submission"]
\ No newline at end of file
+__all__ = ["Submission", "ScreenshotImage"]
\ No newline at end of file
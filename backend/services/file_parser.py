@@ -1,10 +1,12 @@
 # backend/services/file_parser.py
 import re
 from pathlib import Path
-from typing import Optional, Tuple
-import pytesseract
-from PIL import Image
-import io
+from typing import TYPE_CHECKING, Optional, Tuple, Union
+
+# PIL and pytesseract are imported inside the OCR/image functions so that
+# importing the app (and every worker start) doesn't pay for them.
+if TYPE_CHECKING:
+    from PIL import Image
 
 def parse_canvas_filename(filename: str) -> Tuple[str, Optional[str], str]:
     """
@@ -76,16 +78,34 @@ def extract_function_names(code: str) -> list:
     return re.findall(func_pattern, code, re.MULTILINE)
 
 
-async def extract_screenshot_text(image_bytes: bytes) -> str:
-    """OCR screenshot to extract visible text/output"""
+async def extract_screenshot_text(image: Union[bytes, "Image.Image"]) -> str:
+    """
+    OCR screenshot to extract visible text/output.
+
+    Accepts raw image bytes, which are run through ``prepare_for_ocr`` first,
+    or an image that has already been prepared (``normalize_screenshot()["ocr_image"]``).
+    """
     try:
-        img = Image.open(io.BytesIO(image_bytes))
+        import pytesseract
+        from .image_pipeline import load_image, prepare_for_ocr
+
+        if isinstance(image, (bytes, bytearray)):
+            img = prepare_for_ocr(load_image(image)[0])
+        else:
+            img = image
         text = pytesseract.image_to_string(img)
         return text.strip() if text.strip() else "[No text detected in screenshot]"
     except Exception as e:
         return f"[OCR failed: {str(e)}]"
 
 
+def normalize_screenshot(image_bytes: bytes) -> dict:
+    """Thumbnail, recompressed image and OCR-ready copy; see ``image_pipeline.normalize_screenshot``."""
+    from .image_pipeline import normalize_screenshot as _normalize
+
+    return _normalize(image_bytes)
+
+
 def group_files_by_student(file_list: list) -> dict:
     """
     Group uploaded files by student based on Canvas naming.
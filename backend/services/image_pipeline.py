@@ -0,0 +1,172 @@
+# backend/services/image_pipeline.py
+import io
+from typing import Optional, Tuple
+
+from PIL import Image, ImageChops, ImageOps, features
+
+# Longest side of the thumbnail shown in the submission list/viewer
+THUMBNAIL_MAX_SIDE = 480
+THUMBNAIL_QUALITY = 70
+
+# Full-size images are capped at this size and recompressed before storage
+FULL_MAX_SIDE = 2560
+FULL_JPEG_QUALITY = 85
+# Lossless WebP effort (0-6); 2 is within a few % of 6 on screenshots at a fraction of the time
+FULL_WEBP_METHOD = 2
+HAS_WEBP = features.check("webp")
+
+# Tesseract is most accurate around 300 DPI; for screen captures that is
+# roughly a 2000px long side. Anything larger only slows OCR down.
+OCR_MAX_SIDE = 2000
+
+
+def load_image(image_bytes: bytes) -> Tuple[Image.Image, str]:
+    """Open image bytes, apply the EXIF rotation phones like to set, and return (image, format)."""
+    img = Image.open(io.BytesIO(image_bytes))
+    source_format = img.format or "PNG"
+    img.load()
+    return ImageOps.exif_transpose(img), source_format
+
+
+def _fit(img: Image.Image, max_side: int) -> Image.Image:
+    """Downscale so the longest side is at most ``max_side`` (never upscale)."""
+    if max(img.size) <= max_side:
+        return img
+    img = img.copy()
+    img.thumbnail((max_side, max_side), Image.LANCZOS)
+    return img
+
+
+def _to_rgb(img: Image.Image) -> Image.Image:
+    """Flatten transparency onto white so the image can be saved as JPEG."""
+    if img.mode == "RGB":
+        return img
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        rgba = img.convert("RGBA")
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.split()[-1])
+        return background
+    return img.convert("RGB")
+
+
+def _encode_jpeg(img: Image.Image, quality: int) -> bytes:
+    out = io.BytesIO()
+    _to_rgb(img).save(out, format="JPEG", quality=quality, optimize=True, progressive=True)
+    return out.getvalue()
+
+
+def _encode_png(img: Image.Image) -> bytes:
+    out = io.BytesIO()
+    if img.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+        img = img.convert("RGBA")
+    # optimize=True costs ~150ms per 1080p screenshot for <1% savings
+    img.save(out, format="PNG")
+    return out.getvalue()
+
+
+def _encode_webp_lossless(img: Image.Image) -> bytes:
+    out = io.BytesIO()
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+    img.save(out, format="WEBP", lossless=True, method=FULL_WEBP_METHOD)
+    return out.getvalue()
+
+
+def _encode_png_palette(img: Image.Image) -> Optional[bytes]:
+    """Exact palette PNG for images with at most 256 colours, else None."""
+    rgb = _to_rgb(img)
+    if rgb.getcolors(256) is None:
+        return None
+    paletted = rgb.quantize(256, method=Image.Quantize.MEDIANCUT, dither=Image.Dither.NONE)
+    # median cut keeps every colour when there are <= 256; verify rather than trust it
+    if ImageChops.difference(paletted.convert("RGB"), rgb).getbbox() is not None:
+        return None
+    return _encode_png(paletted)
+
+
+def _encode_lossless(img: Image.Image) -> Tuple[bytes, str]:
+    """Smallest lossless encoding available: WebP if Pillow has it, else (palette) PNG."""
+    if HAS_WEBP:
+        return _encode_webp_lossless(img), "image/webp"
+    data = _encode_png_palette(img)
+    if data is None:
+        data = _encode_png(img)
+    return data, "image/png"
+
+
+def make_thumbnail(img: Image.Image) -> Tuple[bytes, str]:
+    """Small JPEG preview used by default when listing submissions."""
+    return _encode_jpeg(_fit(img, THUMBNAIL_MAX_SIDE), THUMBNAIL_QUALITY), "image/jpeg"
+
+
+def recompress_full(img: Image.Image, original: bytes, source_format: str) -> Tuple[bytes, str]:
+    """
+    Re-encode the full-size image for storage.
+
+    Photos (JPEG sources) stay JPEG at a lower quality. Screenshots are
+    re-encoded losslessly so text stays sharp: lossless WebP, or an exact
+    palette PNG when WebP is unavailable and the image has few colours.
+    Whenever the re-encode is not smaller the original bytes are kept.
+    """
+    original_mime = Image.MIME.get(source_format, "image/png")
+    resized = _fit(img, FULL_MAX_SIDE)
+    if source_format == "JPEG":
+        data, mime = _encode_jpeg(resized, FULL_JPEG_QUALITY), "image/jpeg"
+    else:
+        data, mime = _encode_lossless(resized)
+
+    if len(data) >= len(original):
+        return original, original_mime
+    return data, mime
+
+
+def crop_window_chrome(img: Image.Image, tolerance: int = 12) -> Image.Image:
+    """
+    Trim uniform borders (window frames, letterboxing, solid margins)
+    around a grayscale screenshot.
+
+    The colour of the top-left pixel is treated as the border colour; the
+    image is cropped to the bounding box of everything that differs from
+    it by more than ``tolerance``.
+    """
+    background = Image.new(img.mode, img.size, img.getpixel((0, 0)))
+    diff = ImageChops.difference(img, background).point(lambda p: 255 if p > tolerance else 0)
+    bbox = diff.getbbox()
+    if not bbox:
+        return img
+    # keep a little padding so glyphs touching the edge are not clipped
+    pad = 4
+    left, top, right, bottom = bbox
+    bbox = (max(left - pad, 0), max(top - pad, 0), min(right + pad, img.width), min(bottom + pad, img.height))
+    return img.crop(bbox)
+
+
+def prepare_for_ocr(img: Image.Image) -> Image.Image:
+    """Grayscale, crop chrome and downscale an image before running Tesseract."""
+    gray = ImageOps.grayscale(_to_rgb(img))
+    gray = crop_window_chrome(gray)
+    return _fit(gray, OCR_MAX_SIDE)
+
+
+def normalize_screenshot(image_bytes: bytes) -> dict:
+    """
+    Import stage for uploaded screenshots.
+
+    Returns:
+        {
+            "image": full_bytes, "mime_type": str,
+            "thumbnail": thumb_bytes, "thumbnail_mime_type": str,
+            "ocr_image": PIL.Image ready for OCR,
+        }
+    """
+    img, source_format = load_image(image_bytes)
+
+    full, mime = recompress_full(img, image_bytes, source_format)
+    thumb, thumb_mime = make_thumbnail(img)
+    return {
+        "image": full,
+        "mime_type": mime,
+        "thumbnail": thumb,
+        "thumbnail_mime_type": thumb_mime,
+        "ocr_image": prepare_for_ocr(img),
+    }
@@ -1,23 +1,63 @@
 import os
 import json
 import random
+import time
+import asyncio
+import logging
+import importlib
 from typing import Optional
 
 # Support both running as a package (from project root) and directly (from backend dir)
 try:
     from ..config import get_config
+    from .metrics import LLM_REQUESTS, LLM_RETRIES, LLM_SECONDS, LLM_TOKENS, log_event
 except ImportError:
     from config import get_config
+    from services.metrics import LLM_REQUESTS, LLM_RETRIES, LLM_SECONDS, LLM_TOKENS, log_event
 
-try:
-    import openai
-except ImportError:  # OpenAI optional
-    openai = None
+logger = logging.getLogger("gradeflow")
 
-try:
-    import anthropic
-except ImportError:  # Anthropic optional
-    anthropic = None
+# attempts after the first one, with exponential backoff starting at LLM_RETRY_BACKOFF seconds
+LLM_MAX_RETRIES = max(0, int(os.getenv("LLM_MAX_RETRIES", "2")))
+LLM_RETRY_BACKOFF = float(os.getenv("LLM_RETRY_BACKOFF", "0.5"))
+
+# Provider SDKs are slow to import, so they are loaded on first use.
+# Both are optional; a missing SDK falls back to the stub.
+_SDK_CACHE: dict = {}
+
+
+def _load_sdk(name: str):
+    """Import ``openai`` / ``anthropic`` on demand; None if not installed."""
+    if name not in _SDK_CACHE:
+        try:
+            _SDK_CACHE[name] = importlib.import_module(name)
+        except ImportError:
+            _SDK_CACHE[name] = None
+    return _SDK_CACHE[name]
+
+
+def _retry_delay(sdk, exc: Exception, attempt: int) -> Optional[float]:
+    """
+    Seconds to wait before retrying ``exc``, or None if retrying can't help.
+
+    Only rate limits, 5xx responses and connection/timeout errors are
+    retried; a ``retry-after`` header from the provider wins over backoff.
+    """
+    # looked up by name so SDK versions without these classes just don't retry
+    transient = tuple(c for c in (getattr(sdk, "RateLimitError", None), getattr(sdk, "APIConnectionError", None)) if c)
+    status_error = getattr(sdk, "APIStatusError", None)
+    if isinstance(exc, transient):
+        pass
+    elif status_error and isinstance(exc, status_error) and exc.status_code >= 500:
+        pass
+    else:
+        return None
+    response = getattr(exc, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        return max(0.0, float(retry_after))
+    except (TypeError, ValueError):
+        return LLM_RETRY_BACKOFF * 2 ** attempt
 
 
 class LLMProvider:
@@ -35,35 +75,41 @@ class LLMProvider:
         prompt += user_prompt
 
         # route to selected provider if available
-        if provider == "openai" and openai is not None:
-            try:
-                client = openai
-                # using the new OpenAI python library
-                response = client.ChatCompletion.create(
-                    model=model or os.getenv("OPENAI_MODEL", "gpt-4o"),
-                    messages=[
-                        {"role": "system", "content": system_prompt or ""},
-                        {"role": "user", "content": user_prompt},
-                    ],
-                    temperature=0.2,
-                )
-                return response.choices[0].message.content
-            except Exception as e:  # pragma: no cover
-                print("openai request failed", e)
-        elif provider == "anthropic" and anthropic is not None:
-            try:
-                client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-                response = client.messages.create(
-                    model=model or "claude-3-5-sonnet-20241022",
-                    max_tokens=1000,
-                    system=system_prompt or "",
-                    messages=[
-                        {"role": "user", "content": user_prompt},
-                    ],
-                )
-                return response.content[0].text
-            except Exception as e:  # pragma: no cover
-                print("anthropic request failed", e)
+        call = None
+        if provider == "openai" and _load_sdk("openai") is not None:
+            call = lambda: self._openai(model, user_prompt, system_prompt)
+        elif provider == "anthropic" and _load_sdk("anthropic") is not None:
+            call = lambda: self._anthropic(model, user_prompt, system_prompt)
+
+        if call is not None:
+            start = time.perf_counter()
+            for attempt in range(LLM_MAX_RETRIES + 1):
+                try:
+                    text, tokens_in, tokens_out = call()
+                except Exception as e:
+                    logger.warning("%s request failed (attempt %d): %s", provider, attempt + 1, e)
+                    delay = _retry_delay(_load_sdk(provider), e, attempt)
+                    if delay is None or attempt == LLM_MAX_RETRIES:
+                        attempts = attempt + 1
+                        break
+                    LLM_RETRIES.inc(provider=provider)
+                    await asyncio.sleep(delay)
+                    continue
+                elapsed = time.perf_counter() - start
+                LLM_SECONDS.observe(elapsed, provider=provider)
+                LLM_REQUESTS.inc(provider=provider, outcome="success")
+                LLM_TOKENS.inc(tokens_in, provider=provider, direction="in")
+                LLM_TOKENS.inc(tokens_out, provider=provider, direction="out")
+                log_event("llm", provider=provider, model=model, outcome="success", attempts=attempt + 1,
+                          duration_ms=round(elapsed * 1000, 3), tokens_in=tokens_in, tokens_out=tokens_out)
+                return text
+            elapsed = time.perf_counter() - start
+            LLM_SECONDS.observe(elapsed, provider=provider)
+            LLM_REQUESTS.inc(provider=provider, outcome="failure")
+            log_event("llm", provider=provider, model=model, outcome="failure",
+                      attempts=attempts, duration_ms=round(elapsed * 1000, 3))
+
+        LLM_REQUESTS.inc(provider=provider or "none", outcome="stub")
         # stub fallback: produce simple JSON structure
         fallback = {
             "recommended_grade": random.choice([0, 50, 100]),
@@ -74,3 +120,39 @@ class LLMProvider:
             "ta_notes": "",
         }
         return json.dumps(fallback)
+
+    def _openai(self, model: Optional[str], user_prompt: str, system_prompt: Optional[str]):
+        client = _load_sdk("openai")
+        # using the new OpenAI python library
+        response = client.ChatCompletion.create(
+            model=model or os.getenv("OPENAI_MODEL", "gpt-4o"),
+            messages=[
+                {"role": "system", "content": system_prompt or ""},
+                {"role": "user", "content": user_prompt},
+            ],
+            temperature=0.2,
+        )
+        usage = getattr(response, "usage", None)
+        return (
+            response.choices[0].message.content,
+            getattr(usage, "prompt_tokens", 0) or 0,
+            getattr(usage, "completion_tokens", 0) or 0,
+        )
+
+    def _anthropic(self, model: Optional[str], user_prompt: str, system_prompt: Optional[str]):
+        # retries are handled in complete() so they can be counted
+        client = _load_sdk("anthropic").Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"), max_retries=0)
+        response = client.messages.create(
+            model=model or "claude-3-5-sonnet-20241022",
+            max_tokens=1000,
+            system=system_prompt or "",
+            messages=[
+                {"role": "user", "content": user_prompt},
+            ],
+        )
+        usage = getattr(response, "usage", None)
+        return (
+            response.content[0].text,
+            getattr(usage, "input_tokens", 0) or 0,
+            getattr(usage, "output_tokens", 0) or 0,
+        )
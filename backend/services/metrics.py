@@ -0,0 +1,275 @@
+# backend/services/metrics.py
+"""
+In-process metrics with Prometheus text exposition.
+
+    with span("ocr"):
+        text = await extract_screenshot_text(img)
+
+    LLM_REQUESTS.inc(provider="anthropic", outcome="success")
+
+``render()`` produces the body for ``GET /metrics``. Set ``GRADEFLOW_LOG_JSON=1``
+to also emit one structured JSON log line per span and per HTTP request on
+the ``gradeflow`` logger.
+
+With several worker processes, set ``GRADEFLOW_METRICS_DIR`` to a directory
+shared by the workers (and emptied before the server starts). Each process
+then writes its values to ``<dir>/<pid>.json`` (at most every
+``FLUSH_INTERVAL`` seconds, and on exit) and ``render()`` sums all files, so
+every scrape sees the same monotonic totals whichever worker answers it.
+Without the directory each series carries a ``pid`` label instead, so
+per-process counters are never mistaken for one series that resets.
+"""
+import atexit
+import glob
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("gradeflow")
+
+LOG_JSON = os.getenv("GRADEFLOW_LOG_JSON", "").lower() in ("1", "true", "yes")
+if LOG_JSON and not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+
+MULTIPROC_DIR = os.getenv("GRADEFLOW_METRICS_DIR")
+FLUSH_INTERVAL = 1.0
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _format_value(v: float) -> str:
+    if math.isinf(v):
+        return "+Inf" if v > 0 else "-Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+        _maybe_flush()
+
+    def snapshot(self) -> Dict[LabelKey, float]:
+        with self._lock:
+            return dict(self._values)
+
+    @staticmethod
+    def merge(into: Dict[LabelKey, float], values: Dict[LabelKey, float]) -> None:
+        for key, v in values.items():
+            into[key] = into.get(key, 0.0) + v
+
+    def render(self, values: Dict[LabelKey, float]) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, v in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(key)} {_format_value(v)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., sum, count]
+        self._values: Dict[LabelKey, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            row = self._values.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+            row[-2] += value
+            row[-1] += 1
+        _maybe_flush()
+
+    def snapshot(self) -> Dict[LabelKey, List[float]]:
+        with self._lock:
+            return {key: list(row) for key, row in self._values.items()}
+
+    @staticmethod
+    def merge(into: Dict[LabelKey, List[float]], values: Dict[LabelKey, List[float]]) -> None:
+        for key, row in values.items():
+            if key in into and len(into[key]) == len(row):
+                into[key] = [a + b for a, b in zip(into[key], row)]
+            else:
+                into[key] = list(row)
+
+    def render(self, values: Dict[LabelKey, List[float]]) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, row in sorted(values.items()):
+            for bound, n in zip(self.buckets, row):
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', _format_value(bound)))} {_format_value(n)}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, ('le', '+Inf'))} {_format_value(row[-1])}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(row[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {_format_value(row[-1])}")
+        return lines
+
+
+_REGISTRY: List[object] = []
+
+
+def counter(name: str, help_text: str) -> Counter:
+    c = Counter(name, help_text)
+    _REGISTRY.append(c)
+    return c
+
+
+def histogram(name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    h = Histogram(name, help_text, buckets)
+    _REGISTRY.append(h)
+    return h
+
+
+_flush_lock = threading.Lock()
+_last_flush = 0.0
+
+
+def _flush(force: bool = False) -> None:
+    """Write this process's values to ``<MULTIPROC_DIR>/<pid>.json``."""
+    global _last_flush
+    if not MULTIPROC_DIR:
+        return
+    # never block a request on another thread's flush unless we must
+    if not _flush_lock.acquire(blocking=force):
+        return
+    try:
+        now = time.monotonic()
+        if not force and now - _last_flush < FLUSH_INTERVAL:
+            return
+        _last_flush = now
+        data = {m.name: [[list(map(list, key)), v] for key, v in m.snapshot().items()] for m in _REGISTRY}
+        fd, tmp = tempfile.mkstemp(dir=MULTIPROC_DIR, prefix=".metrics-", suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, os.path.join(MULTIPROC_DIR, f"{os.getpid()}.json"))
+    except OSError as e:
+        logger.warning("metrics flush failed: %s", e)
+    finally:
+        _flush_lock.release()
+
+
+def _maybe_flush() -> None:
+    if MULTIPROC_DIR:
+        _flush()
+
+
+def _collect() -> Dict[str, dict]:
+    """Per-metric values summed over every process file (or this process only)."""
+    if not MULTIPROC_DIR:
+        pid = ("pid", str(os.getpid()))
+        return {
+            m.name: {tuple(sorted(key + (pid,))): v for key, v in m.snapshot().items()}
+            for m in _REGISTRY
+        }
+    _flush(force=True)
+    merged: Dict[str, dict] = {m.name: {} for m in _REGISTRY}
+    by_name = {m.name: m for m in _REGISTRY}
+    for path in glob.glob(os.path.join(MULTIPROC_DIR, "*.json")):
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue  # half-written or removed file; picked up next scrape
+        for name, entries in data.items():
+            metric = by_name.get(name)
+            if metric is None:
+                continue
+            values = {tuple(tuple(pair) for pair in key): v for key, v in entries}
+            metric.merge(merged[name], values)
+    return merged
+
+
+def render() -> str:
+    """Prometheus text format (version 0.0.4) for every registered metric."""
+    values = _collect()
+    lines: List[str] = []
+    for metric in _REGISTRY:
+        lines.extend(metric.render(values[metric.name]))
+    return "\n".join(lines) + "\n"
+
+
+if MULTIPROC_DIR:
+    os.makedirs(MULTIPROC_DIR, exist_ok=True)
+    atexit.register(_flush, True)
+
+
+# ----- GradeFlow metrics -----
+STAGE_SECONDS = histogram("gradeflow_stage_duration_seconds", "Time spent in each import/grading stage")
+STAGE_ERRORS = counter("gradeflow_stage_errors_total", "Stages that raised an exception")
+
+HTTP_SECONDS = histogram("gradeflow_http_request_duration_seconds", "HTTP request latency by route")
+
+LLM_SECONDS = histogram("gradeflow_llm_request_duration_seconds", "LLMProvider.complete latency including retries")
+LLM_REQUESTS = counter("gradeflow_llm_requests_total", "LLM completions by provider and outcome (success, failure, stub)")
+LLM_RETRIES = counter("gradeflow_llm_retries_total", "LLM request retries after a failed attempt")
+LLM_TOKENS = counter("gradeflow_llm_tokens_total", "LLM tokens by direction (in, out) as reported by the provider")
+
+
+def log_event(event: str, **fields) -> None:
+    """Structured log line; no-op unless GRADEFLOW_LOG_JSON is set."""
+    if LOG_JSON:
+        logger.info(json.dumps({"event": event, **fields}, default=str))
+
+
+_SPAN_LISTENERS: List[Callable[[str, float], None]] = []
+
+
+def add_span_listener(fn: Callable[[str, float], None]) -> None:
+    """Call ``fn(stage, seconds)`` after every span (the benchmark uses this for per-item samples)."""
+    _SPAN_LISTENERS.append(fn)
+
+
+def remove_span_listener(fn: Callable[[str, float], None]) -> None:
+    _SPAN_LISTENERS.remove(fn)
+
+
+@contextmanager
+def span(stage: str, **fields) -> Iterator[None]:
+    """Time a block into ``gradeflow_stage_duration_seconds{stage=...}``."""
+    start = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except BaseException:
+        failed = True
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        log_event("span", stage=stage, duration_ms=round(elapsed * 1000, 3), error=failed, **fields)
+        for listener in list(_SPAN_LISTENERS):
+            listener(stage, elapsed)
@@ -3,7 +3,7 @@ import { useState } from 'react';
 import { Prism as SyntaxHighlighter } from 'react-syntax-highlighter';
 import { vscDarkPlus } from 'react-syntax-highlighter/dist/esm/styles/prism';
 import { GradeSlider } from './GradeSlider';
-import { Submission } from '../services/api';
+import { api, Submission } from '../services/api';
 
 interface SubmissionViewerProps {
   submission: Submission;
@@ -161,10 +161,11 @@ export function SubmissionViewer({ submission, rubricText, onGradeChange, onRequ
                     <div key={i} className="bg-slate-800/50 rounded-xl overflow-hidden border border-slate-700/30 hover:border-slate-600/50 transition-all group">
                       <div className="relative">
                         <img
-                          src={`data:image/png;base64,${ss.image_data}`}
+                          src={`data:${ss.thumbnail_mime_type || 'image/jpeg'};base64,${ss.thumbnail_data}`}
                           alt={ss.filename}
+                          loading="lazy"
                           className="w-full cursor-pointer hover:opacity-90 transition-opacity"
-                          onClick={() => setExpandedImage(ss.image_data)}
+                          onClick={() => setExpandedImage(api.screenshotUrl(submission.id, i))}
                         />
                         <div className="absolute inset-0 bg-gradient-to-t from-black/50 to-transparent opacity-0 group-hover:opacity-100 transition-opacity flex items-end justify-center pb-4">
                           <span className="text-white text-sm bg-black/50 px-3 py-1 rounded-full backdrop-blur-sm">
@@ -360,7 +361,7 @@ export function SubmissionViewer({ submission, rubricText, onGradeChange, onRequ
               </svg>
             </button>
             <img
-              src={`data:image/png;base64,${expandedImage}`}
+              src={expandedImage}
               alt="Expanded screenshot"
               className="max-w-[90vw] max-h-[85vh] object-contain rounded-lg shadow-2xl"
             />
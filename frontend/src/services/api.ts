@@ -46,7 +46,9 @@ export interface Submission {
   screenshots: Array<{
     filename: string;
     ocr_text: string;
-    image_data: string; // base64
+    mime_type?: string;
+    thumbnail_data: string; // base64; full image via api.screenshotUrl()
+    thumbnail_mime_type?: string;
   }>;
   grade?: GradeResult;
   final_grade?: 0 | 50 | 100;
@@ -112,6 +114,10 @@ export const api = {
     return res.json();
   },
 
+  screenshotUrl(submissionId: number, index: number): string {
+    return `${API_BASE}/submissions/${submissionId}/screenshots/${index}`;
+  },
+
   // Grading
   async gradeSubmission(assignmentId: number, submissionId: number): Promise<GradeResult> {
     const res = await fetch(`${API_BASE}/assignments/${assignmentId}/grade/${submissionId}`, {